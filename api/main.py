@@ -6,7 +6,7 @@ import sys
 # Add src to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from src.predict import predict_churn
+from src.predict import predict_churn, predict_churn_batch, predict_whatif
 import pandas as pd
 import sqlite3
 
@@ -45,11 +45,35 @@ def get_kpis():
 def predict():
     try:
         data = request.get_json()
-        result = predict_churn(data)
+        explain = request.args.get('explain', 'false').lower() == 'true'
+        result = predict_churn(data, explain=explain)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/predict/batch', methods=['POST'])
+def predict_batch():
+    try:
+        data = request.get_json()
+        customers = data['customers'] if isinstance(data, dict) else data
+        explain = request.args.get('explain', 'false').lower() == 'true'
+        results = predict_churn_batch(customers, explain=explain)
+        return jsonify({'predictions': results})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/predict/whatif', methods=['POST'])
+def predict_what_if():
+    try:
+        data = request.get_json()
+        result = predict_whatif(data['customer'], data['interventions'])
+        return jsonify(result)
+    except (KeyError, ValueError) as e:
+        message = f"Missing field: {e}" if isinstance(e, KeyError) else str(e)
+        return jsonify({"error": message}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # Serve React App
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
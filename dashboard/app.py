@@ -168,7 +168,7 @@ elif page == "🔮 Single Prediction":
         
         try:
             with st.spinner("🤖 AI is analyzing..."):
-                response = requests.post(f"{API_URL}/predict", json=payload)
+                response = requests.post(f"{API_URL}/predict", params={"explain": "true"}, json=payload)
                 result = response.json()
             
             st.success("✅ Prediction Complete!")
@@ -196,6 +196,17 @@ elif page == "🔮 Single Prediction":
                        'threshold': {'line': {'color': "black", 'width': 4}, 'thickness': 0.75, 'value': 50}}))
             st.plotly_chart(fig, use_container_width=True)
             
+            # Why this customer scored the way they did
+            if result.get('contributions'):
+                st.subheader("🔎 Top Churn Drivers")
+                drivers_df = pd.DataFrame(result['contributions'][:8]).iloc[::-1]
+                drivers_df['Effect'] = drivers_df['contribution'].apply(
+                    lambda c: 'Raises churn risk' if c > 0 else 'Lowers churn risk')
+                fig = px.bar(drivers_df, x='contribution', y='feature', orientation='h', color='Effect',
+                             color_discrete_map={'Raises churn risk': 'crimson', 'Lowers churn risk': 'seagreen'},
+                             labels={'contribution': 'Contribution (log-odds)', 'feature': 'Feature'})
+                st.plotly_chart(fig, use_container_width=True)
+            
             # Recommendations
             if result['churn_prediction'] == 1:
                 st.warning("⚠️ **Recommended Actions:**")
@@ -258,15 +269,9 @@ elif page == "📂 Batch Prediction":
             
             if st.button("🚀 Predict All", use_container_width=True):
                 with st.spinner(f"🤖 Processing {len(input_df)} predictions..."):
-                    results = []
-                    progress_bar = st.progress(0)
-                    
-                    for idx, row in input_df.iterrows():
-                        payload = row.to_dict()
-                        response = requests.post(f"{API_URL}/predict", json=payload)
-                        result = response.json()
-                        results.append(result)
-                        progress_bar.progress((idx + 1) / len(input_df))
+                    payload = {"customers": input_df.to_dict('records')}
+                    response = requests.post(f"{API_URL}/predict/batch", json=payload)
+                    results = response.json()['predictions']
                     
                     # Combine results
                     results_df = pd.DataFrame(results)
@@ -2,37 +2,148 @@ import joblib
 import pandas as pd
 import numpy as np
 
+from src.explain import INTERACTION_SOURCES, TreeExplainer, fold_interactions
+
+_artifacts = {}
+_explainers = {}
+
 def load_model(model_path='models/churn_model.pkl'):
-    return joblib.load(model_path)
+    # Unpickling 300 trees dominates a single prediction, so load each model file once
+    if model_path not in _artifacts:
+        _artifacts[model_path] = joblib.load(model_path)
+    return _artifacts[model_path]
 
-def predict_churn(customer_data, model_path='models/churn_model.pkl'):
-    artifacts = load_model(model_path)
-    model = artifacts['model']
-    label_encoders = artifacts['label_encoders']
-    scaler = artifacts['scaler']
-    
-    df = pd.DataFrame([customer_data])
-    
-    # Encode categoricals
-    for col, le in label_encoders.items():
-        if col in df.columns:
-            df[col] = le.transform(df[col].astype(str))
-    
+def get_explainer(artifacts, model_path='models/churn_model.pkl'):
+    # Building the TreeSHAP tables walks every tree once, so keep one per model file
+    if model_path not in _explainers:
+        feature_names = artifacts['scaler'].feature_names_in_
+        _explainers[model_path] = TreeExplainer(artifacts['model'], feature_names)
+    return _explainers[model_path]
+
+def add_interactions(df):
     # Create interaction features (MUST match training!)
     df['tenure_contract'] = df['tenure'] * df['Contract']
     df['charges_tenure'] = df['MonthlyCharges'] * df['tenure']
     df['internet_security'] = df['InternetService'] * df['OnlineSecurity']
     df['support_backup'] = df['TechSupport'] * df['OnlineBackup']
-    
-    # Scale
-    df_scaled = scaler.transform(df)
-    
-    # Predict
-    churn_prob = model.predict_proba(df_scaled)[0][1]
-    churn_label = int(churn_prob >= 0.5)
-    
+    return df
+
+def encode_features(df, artifacts):
+    label_encoders = artifacts['label_encoders']
+    df = df.copy()
+
+    # Encode categoricals
+    for col, le in label_encoders.items():
+        if col in df.columns:
+            df[col] = le.transform(df[col].astype(str))
+
+    # Column order as seen in training, extra upload columns dropped
+    df = add_interactions(df)
+    return df[list(artifacts['scaler'].feature_names_in_)]
+
+def prepare_features(df, artifacts):
+    return artifacts['scaler'].transform(encode_features(df, artifacts))
+
+def _result(churn_prob):
     return {
         'churn_probability': float(churn_prob),
-        'churn_prediction': churn_label,
+        'churn_prediction': int(churn_prob >= 0.5),
         'risk_level': 'High' if churn_prob >= 0.7 else 'Medium' if churn_prob >= 0.4 else 'Low'
     }
+
+def _contributions(phi, fields):
+    # Largest drivers first; positive values push towards churn (log-odds)
+    order = np.argsort(-np.abs(phi))
+    return [{'feature': fields[i], 'contribution': float(phi[i])} for i in order]
+
+def predict_churn_batch(customers, model_path='models/churn_model.pkl', explain=False):
+    artifacts = load_model(model_path)
+    model = artifacts['model']
+
+    df = customers if isinstance(customers, pd.DataFrame) else pd.DataFrame(list(customers))
+    df_scaled = prepare_features(df, artifacts)
+
+    # Predict
+    churn_probs = model.predict_proba(df_scaled)[:, 1]
+    results = [_result(p) for p in churn_probs]
+
+    if explain:
+        explainer = get_explainer(artifacts, model_path)
+        phi, fields = fold_interactions(explainer.shap_values(df_scaled), explainer.feature_names)
+        for result, row in zip(results, phi):
+            result['base_value'] = explainer.expected_value
+            result['contributions'] = _contributions(row, fields)
+
+    return results
+
+def predict_churn(customer_data, model_path='models/churn_model.pkl', explain=False):
+    return predict_churn_batch([customer_data], model_path, explain=explain)[0]
+
+def _encode_value(field, value, artifacts):
+    if field not in artifacts['scaler'].feature_names_in_ or field in INTERACTION_SOURCES:
+        raise ValueError(f"Unknown field in intervention: {field}")
+    le = artifacts['label_encoders'].get(field)
+    return le.transform([str(value)])[0] if le is not None else float(value)
+
+def _combinations(encoded, max_variants):
+    # Backtrack over templates, extending only with ones that touch no field already
+    # changed. Every step yields a kept combination, so the work is bounded by
+    # len(encoded) * max_variants however many templates conflict.
+    combos = []
+
+    def extend(combo, fields, start):
+        for t in range(start, len(encoded)):
+            if fields.isdisjoint(encoded[t]):
+                combos.append(combo + (t,))
+                if len(combos) > max_variants:
+                    raise ValueError(f"Interventions expand to more than {max_variants} variants")
+                extend(combo + (t,), fields | set(encoded[t]), t + 1)
+
+    extend((), set(), 0)
+    return combos
+
+def predict_whatif(customer_data, interventions, model_path='models/churn_model.pkl', max_variants=1000):
+    """Score every non-conflicting combination of intervention templates in one call.
+
+    Each template is ``{'name': ..., 'changes': {field: new_value}}``. Templates that
+    change the same field (e.g. one- vs two-year contract) are never combined.
+    Raises ValueError if the templates expand to more than ``max_variants`` rows.
+    """
+    artifacts = load_model(model_path)
+    model = artifacts['model']
+    scaler = artifacts['scaler']
+
+    base = encode_features(pd.DataFrame([customer_data]), artifacts)
+    base_prob = model.predict_proba(scaler.transform(base))[0][1]
+
+    names = [t.get('name') or ', '.join(f"{k}={v}" for k, v in t['changes'].items()) for t in interventions]
+    encoded = [{field: _encode_value(field, value, artifacts) for field, value in t['changes'].items()}
+               for t in interventions]
+
+    # One row per combination, membership[i, t] says whether template t applies to row i
+    combos = _combinations(encoded, max_variants)
+    if not combos:
+        return {'baseline': _result(base_prob), 'variants': []}
+    membership = np.zeros((len(combos), len(interventions)), dtype=bool)
+    for i, combo in enumerate(combos):
+        membership[i, list(combo)] = True
+
+    # Only the changed encoded columns and the interactions built from them are rewritten
+    variants = pd.DataFrame(np.repeat(base.values, len(combos), axis=0), columns=base.columns)
+    for t, changes in enumerate(encoded):
+        for field, value in changes.items():
+            variants.loc[membership[:, t], field] = value
+    variants = add_interactions(variants)
+
+    churn_probs = model.predict_proba(scaler.transform(variants))[:, 1]
+
+    results = []
+    for combo, churn_prob in zip(combos, churn_probs):
+        result = _result(churn_prob)
+        result['interventions'] = [names[t] for t in combo]
+        result['changes'] = {field: value for t in combo for field, value in interventions[t]['changes'].items()}
+        result['probability_reduction'] = float(base_prob - churn_prob)
+        results.append(result)
+    results.sort(key=lambda r: r['probability_reduction'], reverse=True)
+
+    return {'baseline': _result(base_prob), 'variants': results}